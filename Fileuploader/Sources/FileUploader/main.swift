@@ -13,9 +13,12 @@ struct PresignedURLRequest: Codable {
     let file_name: String
     let content_type: String
     let file_size: Int?
+    let method: String
 }
 
 struct PresignedURLResponse: Codable {
+    let version: Int
+    let method: String
     let presigned_put_url: String
     let file_key: String
     let bucket: String
@@ -27,7 +30,7 @@ struct PresignedURLResponse: Codable {
         let url: String
         let fields: [String: String]
     }
-    let presigned_post: PresignedPost
+    let presigned_post: PresignedPost?
 }
 
 struct ConfirmUploadRequest: Codable {
@@ -249,7 +252,8 @@ class FileUploadService {
         let request = PresignedURLRequest(
             file_name: fileName,
             content_type: contentType,
-            file_size: fileSize
+            file_size: fileSize,
+            method: "put"
         )
         
         let requestData = try JSONEncoder().encode(request)
@@ -1,9 +1,252 @@
 import json
-import boto3
-import uuid
+import hmac
+import hashlib
+import base64
+import botocore.session
+from botocore.config import Config
 import os
-from datetime import datetime
-from urllib.parse import unquote, quote
+import secrets
+import time
+import urllib.request
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+# orjson is bundled with the function for faster (de)serialization; fall back to stdlib json
+try:
+    import orjson
+    
+    def _dumps(obj):
+        return orjson.dumps(obj).decode('utf-8')
+    
+    _loads = orjson.loads
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
+
+# Function configuration is fixed for the lifetime of the container
+_BUCKET = os.environ.get('BUCKET_NAME')
+_SECRET_ARN = os.environ.get('SECRET_ARN')
+_MISCONFIGURED = not (_BUCKET and _SECRET_ARN)
+
+# Plain botocore session (no boto3 layer) supplies credentials and region for local signing
+_SESSION = botocore.session.get_session()
+_REGION = _SESSION.get_config_variable('region')
+
+# S3 client config: exactly one attempt with 2s connect/read timeouts bounds a slow
+# head_object at about 4s of billed duration; small keepalive pool for warm reuse
+_S3_CONFIG = Config(
+    retries={'total_max_attempts': 1, 'mode': 'standard'},
+    max_pool_connections=4,
+    connect_timeout=2,
+    read_timeout=2,
+    tcp_keepalive=True
+)
+
+# The S3 client is only needed for head_object, so it is built on first use and then reused
+_S3 = None
+
+def _get_s3():
+    global _S3
+    if _S3 is None:
+        _S3 = _SESSION.create_client('s3', config=_S3_CONFIG)
+    return _S3
+
+# Constant response headers and precomputed error bodies shared by every handler
+_JSON_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*'
+}
+
+_ERR_MISSING_AUTH = _dumps({'error': 'Missing Authorization header'})
+_ERR_AUTH_FORMAT = _dumps({'error': 'Invalid Authorization header format. Expected: Bearer <token>'})
+_ERR_SECRET_NOT_FOUND = _dumps({'error': 'Shared secret not found in Secrets Manager'})
+_ERR_SECRET_FETCH = _dumps({'error': 'Failed to retrieve authentication secret'})
+_ERR_INVALID_TOKEN = _dumps({'error': 'Invalid authentication token'})
+_ERR_MISCONFIG = _dumps({'error': 'Missing required environment variables'})
+_ERR_INVALID_JSON = _dumps({'error': 'Invalid JSON in request body'})
+_ERR_MISSING_FILE_NAME = _dumps({'error': 'Missing required field: file_name'})
+_ERR_INVALID_METHOD = _dumps({'error': 'Invalid method. Expected: post or put'})
+_ERR_INVALID_FILES = _dumps({'error': 'files must be a non-empty list of at most 100 entries'})
+_ERR_PRESIGN_FAILED = _dumps({'error': 'Failed to generate presigned URL'})
+_ERR_MISSING_FILE_KEY = _dumps({'error': 'Missing required field: file_key'})
+_ERR_MISSING_CLIENT_METADATA = _dumps({'error': 'trust_client requires an integer content_length and a string content_type'})
+_ERR_FILE_NOT_FOUND = _dumps({'error': 'File not found in S3'})
+_ERR_CONFIRM_FAILED = _dumps({'error': 'Failed to confirm upload'})
+_ERR_INTERNAL = _dumps({'error': 'Internal server error'})
+_ERR_NOT_FOUND = _dumps({
+    'error': 'Endpoint not found',
+    'available_endpoints': [
+        'POST /presigned-url - Generate presigned URL for file upload',
+        'POST /confirm-upload - Confirm file upload completion'
+    ]
+})
+
+# Upper bound on files signed in a single /presigned-url request
+_MAX_BATCH_FILES = 100
+
+# Bumped whenever the /presigned-url response shape changes
+_PRESIGN_RESPONSE_VERSION = 2
+
+def _ok(body_obj):
+    """
+    Build a 200 response, serializing the body once
+    """
+    return {'statusCode': 200, 'headers': _JSON_HEADERS, 'body': _dumps(body_obj)}
+
+def _err(status, body):
+    """
+    Build an error response from a precomputed JSON body
+    """
+    return {'statusCode': status, 'headers': _JSON_HEADERS, 'body': body}
+
+# Secrets are read through the AWS Parameters and Secrets Lambda Extension, which
+# caches them outside the function process (see SECRETS_MANAGER_TTL in main.tf)
+_SECRETS_EXTENSION_URL = (
+    f"http://localhost:{os.environ.get('PARAMETERS_SECRETS_EXTENSION_HTTP_PORT', '2773')}"
+    "/secretsmanager/get"
+)
+
+# Shared secret cached in process memory so warm invocations skip even the local extension call
+_SECRET_CACHE = {'value': None, 'expires': 0.0}
+
+def _get_shared_secret(secret_arn, ttl=300):
+    """
+    Return the shared secret, fetching it from the secrets extension at most once per TTL
+    """
+    if time.monotonic() < _SECRET_CACHE['expires']:
+        return _SECRET_CACHE['value']
+    
+    request = urllib.request.Request(
+        f"{_SECRETS_EXTENSION_URL}?secretId={quote(secret_arn, safe='')}",
+        headers={'X-Aws-Parameters-Secrets-Token': os.environ.get('AWS_SESSION_TOKEN', '')}
+    )
+    with urllib.request.urlopen(request, timeout=2) as response:
+        secret_response = _loads(response.read())
+    secret_data = _loads(secret_response['SecretString'])
+    shared_secret = secret_data.get('shared_secret')
+    
+    # Only cache a usable secret so a missing value is retried on the next request
+    if shared_secret:
+        _SECRET_CACHE['value'] = shared_secret
+        _SECRET_CACHE['expires'] = time.monotonic() + ttl
+    return shared_secret
+
+# SigV4 signing keys only change daily, so keep the current one per credential and region
+_SIGNING_KEYS = {}
+
+def _hmac_sha256(key, msg):
+    return hmac.new(key, msg.encode('utf-8'), hashlib.sha256).digest()
+
+def _signing_key(secret_key, date_stamp, region):
+    """
+    Derive (or reuse) the SigV4 signing key for S3 on the given date
+    """
+    cache_key = (secret_key, date_stamp, region)
+    signing_key = _SIGNING_KEYS.get(cache_key)
+    if signing_key is None:
+        k_date = _hmac_sha256(('AWS4' + secret_key).encode('utf-8'), date_stamp)
+        k_region = _hmac_sha256(k_date, region)
+        k_service = _hmac_sha256(k_region, 's3')
+        signing_key = _hmac_sha256(k_service, 'aws4_request')
+        _SIGNING_KEYS.clear()
+        _SIGNING_KEYS[cache_key] = signing_key
+    return signing_key
+
+def _s3_endpoint(bucket, region):
+    """
+    Return the S3 host and bucket path prefix, using path-style for dotted bucket names
+    """
+    # Dotted names don't match the *.s3.<region>.amazonaws.com certificate
+    if '.' in bucket:
+        return f"s3.{region}.amazonaws.com", f"/{bucket}"
+    return f"{bucket}.s3.{region}.amazonaws.com", ''
+
+def _sigv4_presign_put(bucket, key, content_type, metadata, expires, creds, region):
+    """
+    Build a query-string signed S3 PUT URL without going through botocore
+    """
+    amz_date = time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())
+    date_stamp = amz_date[:8]
+    scope = f"{date_stamp}/{region}/s3/aws4_request"
+    host, bucket_path = _s3_endpoint(bucket, region)
+    canonical_uri = f"{bucket_path}/{quote(key, safe='/~')}"
+    
+    # Metadata travels in the query string so the uploader only has to send Content-Type
+    params = {
+        'X-Amz-Algorithm': 'AWS4-HMAC-SHA256',
+        'X-Amz-Credential': f"{creds.access_key}/{scope}",
+        'X-Amz-Date': amz_date,
+        'X-Amz-Expires': str(expires),
+        'X-Amz-SignedHeaders': 'content-type;host',
+        **metadata
+    }
+    if creds.token:
+        params['X-Amz-Security-Token'] = creds.token
+    
+    canonical_query = '&'.join(
+        f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}"
+        for k, v in sorted(params.items())
+    )
+    canonical_request = '\n'.join([
+        'PUT',
+        canonical_uri,
+        canonical_query,
+        f"content-type:{' '.join(content_type.split())}\nhost:{host}\n",
+        'content-type;host',
+        'UNSIGNED-PAYLOAD'
+    ])
+    string_to_sign = '\n'.join([
+        'AWS4-HMAC-SHA256',
+        amz_date,
+        scope,
+        hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()
+    ])
+    signature = hmac.new(
+        _signing_key(creds.secret_key, date_stamp, region),
+        string_to_sign.encode('utf-8'),
+        hashlib.sha256
+    ).hexdigest()
+    
+    return f"https://{host}{canonical_uri}?{canonical_query}&X-Amz-Signature={signature}"
+
+def _sigv4_presign_post(bucket, key, fields, conditions, expires, creds, region):
+    """
+    Build a SigV4 signed POST policy for form uploads without going through botocore
+    """
+    now = time.time()
+    amz_date = time.strftime('%Y%m%dT%H%M%SZ', time.gmtime(now))
+    date_stamp = amz_date[:8]
+    credential = f"{creds.access_key}/{date_stamp}/{region}/s3/aws4_request"
+    
+    fields = {
+        **fields,
+        'key': key,
+        'x-amz-algorithm': 'AWS4-HMAC-SHA256',
+        'x-amz-credential': credential,
+        'x-amz-date': amz_date
+    }
+    conditions = conditions + [
+        {'x-amz-algorithm': 'AWS4-HMAC-SHA256'},
+        {'x-amz-credential': credential},
+        {'x-amz-date': amz_date}
+    ]
+    if creds.token:
+        fields['x-amz-security-token'] = creds.token
+        conditions.append({'x-amz-security-token': creds.token})
+    
+    policy = {
+        'expiration': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(now + expires)),
+        'conditions': conditions
+    }
+    fields['policy'] = base64.b64encode(_dumps(policy).encode('utf-8')).decode('utf-8')
+    fields['x-amz-signature'] = hmac.new(
+        _signing_key(creds.secret_key, date_stamp, region),
+        fields['policy'].encode('utf-8'),
+        hashlib.sha256
+    ).hexdigest()
+    
+    host, bucket_path = _s3_endpoint(bucket, region)
+    return {'url': f"https://{host}{bucket_path or '/'}", 'fields': fields}
 
 def authenticate_request(event, secret_arn):
     """
@@ -14,150 +257,59 @@ def authenticate_request(event, secret_arn):
     auth_header = headers.get('Authorization') or headers.get('authorization')
     
     if not auth_header:
-        return False, {
-            'statusCode': 401,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'error': 'Missing Authorization header'
-            })
-        }
+        return False, _err(401, _ERR_MISSING_AUTH)
     
     # Extract the token from Authorization header (expects "Bearer <token>")
     if not auth_header.startswith('Bearer '):
-        return False, {
-            'statusCode': 401,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'error': 'Invalid Authorization header format. Expected: Bearer <token>'
-            })
-        }
+        return False, _err(401, _ERR_AUTH_FORMAT)
     
     provided_token = auth_header[7:]  # Remove "Bearer " prefix
     
     # Retrieve the shared secret from AWS Secrets Manager
-    secrets_client = boto3.client('secretsmanager')
-    
     try:
-        secret_response = secrets_client.get_secret_value(SecretId=secret_arn)
-        secret_data = json.loads(secret_response['SecretString'])
-        expected_secret = secret_data.get('shared_secret')
+        expected_secret = _get_shared_secret(secret_arn)
         
         if not expected_secret:
-            return False, {
-                'statusCode': 500,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({
-                    'error': 'Shared secret not found in Secrets Manager'
-                })
-            }
+            return False, _err(500, _ERR_SECRET_NOT_FOUND)
             
     except Exception as e:
         print(f"Error retrieving secret: {str(e)}")
-        return False, {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'error': 'Failed to retrieve authentication secret'
-            })
-        }
+        return False, _err(500, _ERR_SECRET_FETCH)
     
     # Validate the provided token against the shared secret
-    if provided_token != expected_secret:
-        return False, {
-            'statusCode': 401,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'error': 'Invalid authentication token'
-            })
-        }
+    if not hmac.compare_digest(provided_token.encode('utf-8'), expected_secret.encode('utf-8')):
+        return False, _err(401, _ERR_INVALID_TOKEN)
     
     return True, None
 
-def generate_presigned_url(event, context):
+def _presign_file(bucket_name, file_name, content_type, method, now_iso, now_stamp, creds, region):
     """
-    Generate a presigned URL for direct S3 upload
+    Sign a single upload and return its entry for the presigned URL response
     """
-    bucket_name = os.environ.get('BUCKET_NAME')
-    secret_arn = os.environ.get('SECRET_ARN')
-    
-    if not bucket_name or not secret_arn:
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'error': 'Missing required environment variables'
-            })
-        }
-    
-    # Authenticate the request
-    authenticated, auth_error = authenticate_request(event, secret_arn)
-    if not authenticated:
-        return auth_error
-    
-    # Parse the request body
-    body = event.get('body', '')
-    if event.get('isBase64Encoded', False):
-        import base64
-        body = base64.b64decode(body).decode('utf-8')
-    
-    try:
-        request_data = json.loads(body) if body else {}
-    except json.JSONDecodeError:
-        return {
-            'statusCode': 400,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'error': 'Invalid JSON in request body'
-            })
-        }
+    # Generate unique file key
+    unique_id = secrets.token_hex(4)
+    file_key = f"uploads/{now_stamp}_{unique_id}_{file_name}"
     
-    # Extract file metadata
-    file_name = request_data.get('file_name')
-    content_type = request_data.get('content_type', 'application/octet-stream')
-    file_size = request_data.get('file_size')  # Optional, for validation
-    
-    if not file_name:
-        return {
-            'statusCode': 400,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'error': 'Missing required field: file_name'
-            })
-        }
+    # URL-encode the filename to ensure it contains only ASCII characters
+    encoded_filename = quote(file_name, safe='')
+    metadata = {
+        'x-amz-meta-uploaded-at': now_iso,
+        'x-amz-meta-original-filename': encoded_filename
+    }
     
-    # Generate unique file key
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    unique_id = str(uuid.uuid4())[:8]
-    file_key = f"uploads/{timestamp}_{unique_id}_{file_name}"
+    # Optional: Add file size limit (max 10GB)
+    max_file_size = 10 * 1024 * 1024 * 1024  # 10GB
     
-    # Generate presigned URL for PUT operation
-    s3_client = boto3.client('s3')
+    result = {
+        'method': method,
+        'file_key': file_key,
+        'bucket': bucket_name,
+        'expires_in': 3600,
+        'max_file_size': max_file_size,
+        'generated_at': now_iso
+    }
     
-    try:
+    if method == 'post':
         # Set conditions for the presigned URL
         conditions = [
             {'bucket': bucket_name},
@@ -166,202 +318,216 @@ def generate_presigned_url(event, context):
         ]
         
         # Add metadata conditions
-        # URL-encode the filename to ensure it contains only ASCII characters
-        encoded_filename = quote(file_name, safe='')
-        metadata = {
-            'x-amz-meta-uploaded-at': datetime.now().isoformat(),
-            'x-amz-meta-original-filename': encoded_filename
-        }
-        
         for key, value in metadata.items():
             conditions.append({key: value})
         
-        # Optional: Add file size limit (max 10GB)
-        max_file_size = 10 * 1024 * 1024 * 1024  # 10GB
         conditions.append(['content-length-range', 1, max_file_size])
         
         # Generate presigned POST URL (better for large files)
-        presigned_post = s3_client.generate_presigned_post(
-            Bucket=bucket_name,
-            Key=file_key,
-            Fields={
+        presigned_post = _sigv4_presign_post(
+            bucket_name,
+            file_key,
+            {
                 'Content-Type': content_type,
                 **metadata
             },
-            Conditions=conditions,
-            ExpiresIn=3600  # 1 hour expiration
+            conditions,
+            3600,  # 1 hour expiration
+            creds,
+            region
         )
-        
-        # Also generate a simple presigned PUT URL as alternative
-        presigned_put_url = s3_client.generate_presigned_url(
-            'put_object',
-            Params={
-                'Bucket': bucket_name,
-                'Key': file_key,
-                'ContentType': content_type,
-                'Metadata': {
-                    'uploaded-at': datetime.now().isoformat(),
-                    'original-filename': encoded_filename
-                }
-            },
-            ExpiresIn=3600
+        result['presigned_post'] = {
+            'url': presigned_post['url'],
+            'fields': presigned_post['fields']
+        }
+        result['instructions'] = {
+            'post_method': 'Use presigned_post.url with form data including presigned_post.fields'
+        }
+    else:
+        # Generate a simple presigned PUT URL
+        result['presigned_put_url'] = _sigv4_presign_put(
+            bucket_name,
+            file_key,
+            content_type,
+            metadata,
+            3600,
+            creds,
+            region
         )
-        
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'presigned_post': {
-                    'url': presigned_post['url'],
-                    'fields': presigned_post['fields']
-                },
-                'presigned_put_url': presigned_put_url,
-                'file_key': file_key,
-                'bucket': bucket_name,
-                'expires_in': 3600,
-                'max_file_size': max_file_size,
-                'generated_at': datetime.now().isoformat(),
-                'instructions': {
-                    'post_method': 'Use presigned_post.url with form data including presigned_post.fields',
-                    'put_method': 'Use presigned_put_url with PUT request and file as body'
-                }
-            })
+        result['instructions'] = {
+            'put_method': 'Use presigned_put_url with PUT request and file as body'
         }
+    
+    return result
+
+def generate_presigned_url(event, context):
+    """
+    Generate presigned URLs for direct S3 upload of one file or a batch of files
+    """
+    if _MISCONFIGURED:
+        return _err(500, _ERR_MISCONFIG)
+    
+    bucket_name = _BUCKET
+    
+    # Authenticate the request
+    authenticated, auth_error = authenticate_request(event, _SECRET_ARN)
+    if not authenticated:
+        return auth_error
+    
+    # Parse the request body
+    body = event.get('body', '')
+    if event.get('isBase64Encoded', False):
+        body = base64.b64decode(body).decode('utf-8')
+    
+    try:
+        request_data = _loads(body) if body else {}
+    except json.JSONDecodeError:
+        return _err(400, _ERR_INVALID_JSON)
+    
+    # A "files" array signs a batch in one invocation; otherwise the body describes a single file
+    files = request_data.get('files')
+    is_batch = files is not None
+    if not is_batch:
+        files = [request_data]
+    elif not isinstance(files, list) or not files or len(files) > _MAX_BATCH_FILES:
+        return _err(400, _ERR_INVALID_FILES)
+    
+    # Validate every file before signing anything
+    default_method = request_data.get('method', 'post')
+    uploads = []
+    for file_data in files:
+        if not isinstance(file_data, dict) or not file_data.get('file_name'):
+            return _err(400, _ERR_MISSING_FILE_NAME)
+        
+        method = str(file_data.get('method', default_method)).lower()
+        if method not in ('post', 'put'):
+            return _err(400, _ERR_INVALID_METHOD)
+        
+        uploads.append((
+            file_data['file_name'],
+            file_data.get('content_type', 'application/octet-stream'),
+            method
+        ))
+    
+    # Take one UTC timestamp per request so the file keys and metadata agree
+    now = datetime.now(timezone.utc)
+    now_iso = now.isoformat()
+    now_stamp = f"{now.year:04d}{now.month:02d}{now.day:02d}_{now.hour:02d}{now.minute:02d}{now.second:02d}"
+    
+    # Generate a presigned artifact for the requested upload method only
+    try:
+        # Presigning is purely local, so sign with the execution role's credentials directly
+        creds = _SESSION.get_credentials().get_frozen_credentials()
+        region = _REGION
+        
+        # Local signing is a few HMACs per file, so a plain loop beats a thread pool here
+        results = [
+            _presign_file(bucket_name, file_name, content_type, method, now_iso, now_stamp, creds, region)
+            for file_name, content_type, method in uploads
+        ]
+        
+        if is_batch:
+            response_body = {'version': _PRESIGN_RESPONSE_VERSION, 'results': results}
+        else:
+            response_body = {'version': _PRESIGN_RESPONSE_VERSION, **results[0]}
+        
+        return _ok(response_body)
         
     except Exception as e:
         print(f"Error generating presigned URL: {str(e)}")
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'error': 'Failed to generate presigned URL'
-            })
-        }
+        return _err(500, _ERR_PRESIGN_FAILED)
 
 def confirm_upload(event, context):
     """
     Confirm that a file upload was completed successfully
     """
-    bucket_name = os.environ.get('BUCKET_NAME')
-    secret_arn = os.environ.get('SECRET_ARN')
-    
-    if not bucket_name or not secret_arn:
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'error': 'Missing required environment variables'
-            })
-        }
+    if _MISCONFIGURED:
+        return _err(500, _ERR_MISCONFIG)
+    
+    bucket_name = _BUCKET
     
     # Authenticate the request
-    authenticated, auth_error = authenticate_request(event, secret_arn)
+    authenticated, auth_error = authenticate_request(event, _SECRET_ARN)
     if not authenticated:
         return auth_error
     
     # Parse the request body
     body = event.get('body', '')
     if event.get('isBase64Encoded', False):
-        import base64
         body = base64.b64decode(body).decode('utf-8')
     
     try:
-        request_data = json.loads(body) if body else {}
+        request_data = _loads(body) if body else {}
     except json.JSONDecodeError:
-        return {
-            'statusCode': 400,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'error': 'Invalid JSON in request body'
-            })
-        }
+        return _err(400, _ERR_INVALID_JSON)
     
     file_key = request_data.get('file_key')
     
     if not file_key:
-        return {
-            'statusCode': 400,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'error': 'Missing required field: file_key'
-            })
-        }
+        return _err(400, _ERR_MISSING_FILE_KEY)
     
-    # Check if the file exists in S3
-    s3_client = boto3.client('s3')
+    # Generate the S3 object URL
+    host, bucket_path = _s3_endpoint(bucket_name, _REGION)
+    s3_url = f"https://{host}{bucket_path}/{quote(file_key, safe='/~')}"
+    
+    # In trust_client mode the uploader reports what it sent and S3 is not consulted
+    if request_data.get('trust_client'):
+        content_length = request_data.get('content_length')
+        client_content_type = request_data.get('content_type')
+        
+        # Must match the types head_object reports in strict mode
+        if (
+            not isinstance(content_length, int)
+            or isinstance(content_length, bool)
+            or content_length < 0
+            or not isinstance(client_content_type, str)
+            or not client_content_type
+        ):
+            return _err(400, _ERR_MISSING_CLIENT_METADATA)
+        
+        return _ok({
+            'message': 'File upload confirmed',
+            'verified': False,
+            'file_key': file_key,
+            's3_url': s3_url,
+            'bucket': bucket_name,
+            'file_size': content_length,
+            'content_type': client_content_type,
+            'confirmed_at': datetime.now(timezone.utc).isoformat()
+        })
     
+    # Check if the file exists in S3
+    s3_client = _get_s3()
     try:
         response = s3_client.head_object(Bucket=bucket_name, Key=file_key)
         
-        # Generate the S3 object URL
-        s3_url = f"https://{bucket_name}.s3.amazonaws.com/{file_key}"
-        
-        # Decode the original filename in metadata for display
-        metadata = response.get('Metadata', {}).copy()
-        if 'original-filename' in metadata:
-            try:
-                metadata['original-filename'] = unquote(metadata['original-filename'])
-            except Exception:
-                # If decoding fails, keep the encoded version
-                pass
+        # original-filename stays URL-encoded; clients decode it for display
+        metadata = response.get('Metadata', {})
         
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'message': 'File upload confirmed',
-                'file_key': file_key,
-                's3_url': s3_url,
-                'bucket': bucket_name,
-                'file_size': response['ContentLength'],
-                'content_type': response['ContentType'],
-                'last_modified': response['LastModified'].isoformat(),
-                'metadata': metadata,
-                'confirmed_at': datetime.now().isoformat()
-            })
-        }
+        return _ok({
+            'message': 'File upload confirmed',
+            'verified': True,
+            'file_key': file_key,
+            's3_url': s3_url,
+            'bucket': bucket_name,
+            'file_size': response['ContentLength'],
+            'content_type': response['ContentType'],
+            'last_modified': response['LastModified'].isoformat(),
+            'metadata': metadata,
+            'confirmed_at': datetime.now(timezone.utc).isoformat()
+        })
         
     except s3_client.exceptions.NoSuchKey:
-        return {
-            'statusCode': 404,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'error': 'File not found in S3'
-            })
-        }
+        return _err(404, _ERR_FILE_NOT_FOUND)
     except Exception as e:
         print(f"Error confirming upload: {str(e)}")
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'error': 'Failed to confirm upload'
-            })
-        }
+        return _err(500, _ERR_CONFIRM_FAILED)
+
+# (resource path, HTTP method) -> request handler
+_ROUTES = {
+    ('/presigned-url', 'POST'): generate_presigned_url,
+    ('/confirm-upload', 'POST'): confirm_upload,
+}
 
 def handler(event, context):
     """
@@ -374,35 +540,11 @@ def handler(event, context):
         
         print(f"Resource: {resource_path}, Method: {http_method}")
         
-        if resource_path == '/presigned-url' and http_method == 'POST':
-            return generate_presigned_url(event, context)
-        elif resource_path == '/confirm-upload' and http_method == 'POST':
-            return confirm_upload(event, context)
-        else:
-            return {
-                'statusCode': 404,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({
-                    'error': 'Endpoint not found',
-                    'available_endpoints': [
-                        'POST /presigned-url - Generate presigned URL for file upload',
-                        'POST /confirm-upload - Confirm file upload completion'
-                    ]
-                })
-            }
+        route = _ROUTES.get((resource_path, http_method))
+        if route is None:
+            return _err(404, _ERR_NOT_FOUND)
+        return route(event, context)
         
     except Exception as e:
         print(f"Unexpected error: {str(e)}")
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'error': 'Internal server error'
-            })
-        }
+        return _err(500, _ERR_INTERNAL)
@@ -3,10 +3,22 @@
 # Script to package Lambda function for deployment
 echo "Packaging Lambda function..."
 
-# Remove existing zip file if it exists
+# Remove existing zip file and build directory if they exist
 rm -f function.zip
+rm -rf build
 
-# Create the zip file with the Python code
+# Install dependencies for the Lambda runtime (python3.11 on x86_64)
+pip install -r requirements.txt \
+    --target build \
+    --platform manylinux2014_x86_64 \
+    --python-version 3.11 \
+    --only-binary=:all:
+
+# Create the zip file with the dependencies and the Python code
+(cd build && zip -r ../function.zip .)
 zip function.zip index.py
 
-echo "Lambda function packaged as function.zip"
\ No newline at end of file
+# Clean up the build directory
+rm -rf build
+
+echo "Lambda function packaged as function.zip"
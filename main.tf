@@ -129,10 +129,16 @@ resource "aws_lambda_function" "file_upload_api" {
   timeout         = 30
   source_code_hash = filebase64sha256("lambda/function.zip")
 
+  # AWS Parameters and Secrets Lambda Extension serves the shared secret from a local cache
+  layers = [
+    "arn:aws:lambda:${var.aws_region}:177933569100:layer:AWS-Parameters-and-Secrets-Lambda-Extension:${var.secrets_extension_layer_version}"
+  ]
+
   environment {
     variables = {
-      BUCKET_NAME = aws_s3_bucket.file_upload_bucket.bucket
-      SECRET_ARN  = aws_secretsmanager_secret.api_secret.arn
+      BUCKET_NAME         = aws_s3_bucket.file_upload_bucket.bucket
+      SECRET_ARN          = aws_secretsmanager_secret.api_secret.arn
+      SECRETS_MANAGER_TTL = var.secrets_extension_cache_ttl
     }
   }
 
@@ -34,4 +34,16 @@ variable "api_stage_name" {
   description = "API Gateway stage name"
   type        = string
   default     = "v1"
+}
+
+variable "secrets_extension_layer_version" {
+  description = "Version of the AWS Parameters and Secrets Lambda Extension layer for the selected region"
+  type        = number
+  default     = 11
+}
+
+variable "secrets_extension_cache_ttl" {
+  description = "Seconds the secrets extension caches the shared secret before refreshing it"
+  type        = number
+  default     = 300
 }
\ No newline at end of file